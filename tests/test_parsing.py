@@ -0,0 +1,61 @@
+import os
+import sys
+import tempfile
+import types
+
+import pytest
+
+# The bridge reads its settings from ~ at import time; point HOME at a scratch
+# directory so the tests never touch the real settings or waypoint file.
+os.environ["HOME"] = os.environ["USERPROFILE"] = tempfile.mkdtemp()
+
+try:
+    import pyperclip  # noqa: F401
+except ImportError:
+    stub = types.ModuleType("pyperclip")
+    stub.paste = lambda: ""
+    stub.copy = lambda text: None
+    sys.modules["pyperclip"] = stub
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from xaero_clip_bridge import parse_tp_command, process_clip_item  # noqa: E402
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("X: 123 Y: 64 Z: -456", (123, 64, -456)),
+    ("X: 10 Y: 80 Z: 20", (10, 80, 20)),
+    ("X: 100.5 Z: -20.3", (100, 64, -20)),
+    ("x 1 y 2 z 3", (1, 2, 3)),
+    ("X: 1 Y: 2 Y: 3 Z: 4", (1, 2, 4)),
+    ("100 70 -200", (100, 70, -200)),
+])
+def test_coordinate_text(text, expected):
+    assert process_clip_item(text) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("/tp 100 70 -200", (100, 70, -200)),
+    ("/tp @p 100 70 -200", (100, 70, -200)),
+    ("/tp 100 ~ -200", (100, 64, -200)),
+    ("/tp 100 -200", (100, 64, -200)),
+    ("/tp ~ ~ ~", (0, 64, 0)),
+])
+def test_tp_command(text, expected):
+    assert process_clip_item(text) == expected
+    assert parse_tp_command(text) == expected
+
+
+def test_tp_command_without_coords():
+    assert parse_tp_command("/tp foo") is None
+
+
+@pytest.mark.parametrize("text", ["", "hello world", "no digits here"])
+def test_no_coords(text):
+    assert process_clip_item(text) is None
+
+
+def test_long_text_rejected():
+    text = "a" * 190 + " X: 1 Y: 2 Z: 3"
+    assert len(text) > 200
+    assert process_clip_item(text) is None
@@ -9,6 +9,7 @@ Xaero Clipboard → Waypoint bridge with Tk GUI
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import threading
+import atexit
 import queue
 import time
 import re
@@ -16,9 +17,16 @@ import os
 import json
 import random
 import pyperclip
+from collections import deque
 from datetime import datetime
 import ctypes
 
+# Optional: faster settings serialization when orjson is installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # HiDPI awareness for Windows (fixes blurry Tk on HiDPI displays)
 try:
     ctypes.windll.shcore.SetProcessDpiAwareness(1)
@@ -58,27 +66,77 @@ def load_settings():
 
 def save_settings():
     try:
-        with open(DEFAULT_SETTINGS_PATH, "w", encoding="utf-8") as f:
-            json.dump(settings, f, indent=2)
+        if orjson is not None:
+            data = orjson.dumps(settings, option=orjson.OPT_INDENT_2)
+        else:
+            data = json.dumps(settings, indent=2).encode("utf-8")
+        # write a temp file and swap it in, so a crash mid-write can't leave
+        # a truncated settings file behind
+        tmp = DEFAULT_SETTINGS_PATH + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, DEFAULT_SETTINGS_PATH)
+        return True
     except Exception as e:
         print("Failed to save settings:", e)
+        return False
+
+# Settings changes are only marked dirty and written out periodically by
+# flush_settings(), so bursts of waypoints (name_counter bumps) or UI tweaks
+# cost one file write instead of one per change.
+SETTINGS_FLUSH_INTERVAL_MS = 5000
+_settings_dirty = threading.Event()
+_settings_lock = threading.Lock()
+
+def mark_settings_dirty():
+    _settings_dirty.set()
+
+def flush_settings(force=False):
+    with _settings_lock:
+        if force or _settings_dirty.is_set():
+            _settings_dirty.clear()
+            if not save_settings():
+                # keep the changes pending so the next flush retries them
+                _settings_dirty.set()
+
+# also covers exits that don't go through App.on_close, so name_counter isn't
+# rolled back to the last periodic flush
+atexit.register(flush_settings, True)
 
 load_settings()
 
 # ----------------------------
 # Regex patterns for coords
 # ----------------------------
-# Matches: /tp 217 -29 103  OR  tp 217 -29 103
-re_tp = re.compile(r"^(?:/)?tp\s+(-?\d+)\s+(-?\d+)\s+(-?\d+)$", re.IGNORECASE)
-# Matches: X: 123 Z: -456 (optionally includes Y:)
-re_XZ = re.compile(r"X[:=]?\s*(-?\d+)[^\d\-+]+Z[:=]?\s*(-?\d+)", re.IGNORECASE)
-# Matches plain "123 -29 103" or "123, -29, 103"
-re_plain = re.compile(r"^\s*(-?\d+)[,\s]+\s*(-?\d+)[,\s]+\s*(-?\d+)\s*$")
+# Helpers for parse_tp_command (compiled once instead of per clipboard event)
+_RE_WS = re.compile(r"\s+")
+_RE_INT_OR_TILDE = re.compile(r"-?\d+|~")
+_TP_TOKENS = frozenset({"/tp", "@p", "@a", "@r", "@s"})
+# All coordinate formats fused into one pattern so process_clip_item scans the text once.
+_RE_ANY = re.compile(
+    # /tp 217 -29 103, /tp @p 217 ~ 103, /tp 217 103 (other /tp forms still go
+    # through parse_tp_command)
+    r"^(?:/tp\s+(?:@[pars]\s+)?(?P<tx>-?\d+|~)\s+(?:(?P<ty>-?\d+|~)\s+)?(?P<tz>-?\d+|~)$)"
+    # X: 123 Z: -456 or X: 123 Y: 70 Z: -456 (Y is captured when present); the
+    # gaps between X, Y and Z are bounded so non-matching text can't cause long scans
+    r"|X[:=]?\s*(?P<xz_x>-?\d+)(?!\d)"
+    r"(?:[^XYZ]{0,64}?Y[:=]?\s*(?P<xz_y>-?\d+)(?!\d)[^XZ]{0,64}?|[^XZ]{1,64}?)"
+    r"Z[:=]?\s*(?P<xz_z>-?\d+)"
+    # plain "123 -29 103" or "123, -29, 103"
+    r"|^\s*(?P<p_x>-?\d+)[,\s]+\s*(?P<p_y>-?\d+)[,\s]+\s*(?P<p_z>-?\d+)\s*$",
+    re.IGNORECASE)
 
 # Additional constants
 POLL_INTERVAL = 1.0  # seconds (used by clipboard watcher)
 MAX_HISTORY = settings.get("recent_limit", 12) or 12
 DEFAULT_Y = settings.get("y_default", 64)
+MAX_COORD_TEXT_LEN = 200  # longer clipboard text is never treated as coordinates
+_COORD_CHARS = frozenset("0123456789~")  # "~" for relative /tp coords
+
+# Cheap pre-filter: most clipboard traffic (prose, URLs, whole documents) can be
+# rejected without running any regex.
+def could_have_coords(text):
+    return len(text) <= MAX_COORD_TEXT_LEN and not _COORD_CHARS.isdisjoint(text)
 
 # Robust /tp parser that handles variants like:
 # /tp 100 70 -200   /tp @p 100 70 -200   /tp 100 ~ -200   /tp 100 -200
@@ -88,14 +146,17 @@ def parse_tp_command(text: str):
         return None
 
     # Split and remove common tokens
-    parts = re.split(r"\s+", txt)
-    parts = [p for p in parts if p.lower() not in ["/tp", "@p", "@a", "@r", "@s"]]
+    parts = _RE_WS.split(txt)
+    parts = [p for p in parts if p.lower() not in _TP_TOKENS]
 
     coords = []
     for p in parts:
-        if re.fullmatch(r"-?\d+", p) or p == "~":
+        if _RE_INT_OR_TILDE.fullmatch(p):
             coords.append(p)
+    return _tp_coords(coords)
 
+def _tp_coords(coords):
+    """Turn the 2 or 3+ numeric/~ tokens of a /tp command into (x, y, z)."""
     # interpret tilde (~)
     for i, val in enumerate(coords):
         if val == "~":
@@ -115,119 +176,420 @@ def parse_tp_command(text: str):
     except ValueError:
         return None
 
+# ----------------------------
+# Utility: cached timestamps
+# ----------------------------
+# strftime is comparatively slow; everything we format has 1s resolution, so
+# keep the last string per format and only re-format when the second changes.
+_ts_cache = {}  # fmt -> (epoch second, formatted string)
+
+def _now_str(fmt="%Y-%m-%d %H:%M:%S"):
+    t = int(time.time())
+    cached = _ts_cache.get(fmt)
+    if cached is None or cached[0] != t:
+        cached = (t, datetime.fromtimestamp(t).strftime(fmt))
+        _ts_cache[fmt] = cached
+    return cached[1]
+
 # ----------------------------
 # Utility: format waypoint line
 # ----------------------------
+# Everything after the coordinates only depends on settings, so it is built
+# once per settings change instead of per waypoint.
+# (color or None when randomized, ":disabled:type:...:visibility:false")
+_wp_format = (None, "")
+WP_FORMAT_KEYS = frozenset({"random_color", "color", "disabled", "wp_type", "visibility_type"})  # settings baked into _wp_format
+
+def refresh_waypoint_format():
+    global _wp_format
+    color = None if settings.get("random_color") else str(int(settings.get("color", 0)))
+    disabled = "true" if settings.get("disabled") else "false"
+    wp_type = int(settings.get("wp_type", 0))   # e.g. 0 normal, 2 deathpoint etc.
+    visibility_type = int(settings.get("visibility_type", 0))
+    # For tp rotate_on_tp and tp_yaw we keep defaults false and 0
+    # destination field: false/true? but in sample it's "false" or "true" at end; we'll keep "false"
+    _wp_format = (color, f":{disabled}:{wp_type}:gui.xaero_default:false:0:{visibility_type}:false")
+
+refresh_waypoint_format()
+
 def generate_waypoint_line(x, y, z, name=None):
     # apply settings
     if settings["auto_name"]:
         cnt = settings.get("name_counter", 1)
         if settings.get("append_timestamp_to_name"):
-            ts = datetime.now().strftime("%Y%m%d-%H%M%S")
+            ts = _now_str("%Y%m%d-%H%M%S")
             name_val = f"{settings['name_prefix']}{cnt}-{ts}"
         else:
             name_val = f"{settings['name_prefix']}{cnt}"
         settings["name_counter"] = cnt + 1
-        save_settings()
+        mark_settings_dirty()
     else:
         name_val = name or settings.get("name_prefix", "Auto")
     initials = (name_val[0] if name_val else "A").upper()
 
-    # color
-    if settings.get("random_color"):
-        color = random.randint(0, 15)
-    else:
-        color = int(settings.get("color", 0))
+    color, suffix = _wp_format
+    if color is None:
+        color = str(random.getrandbits(4))  # 0..15
+    return "".join(("waypoint:", name_val, ":", initials, ":", str(x), ":", str(y), ":", str(z), ":", color, suffix))
 
-    disabled = "true" if settings.get("disabled") else "false"
-    wp_type = int(settings.get("wp_type", 0))   # e.g. 0 normal, 2 deathpoint etc.
-    visibility_type = int(settings.get("visibility_type", 0))
-    # For tp rotate_on_tp and tp_yaw we keep defaults false and 0
-    # destination field: false/true? but in sample it's "false" or "true" at end; we'll keep "false"
-    line = f"waypoint:{name_val}:{initials}:{x}:{y}:{z}:{color}:{disabled}:{wp_type}:gui.xaero_default:false:0:{visibility_type}:false"
-    return line
+# ----------------------------
+# Clipboard reading
+# ----------------------------
+# On Windows read CF_UNICODETEXT straight through Win32 instead of going
+# through pyperclip.paste(); everywhere else (or if setup fails) use pyperclip.
+CF_UNICODETEXT = 13
+
+def _make_win_paste():
+    # private WinDLL instances so our argtypes don't clash with pyperclip's
+    user32 = ctypes.WinDLL("user32")
+    kernel32 = ctypes.WinDLL("kernel32")
+    user32.OpenClipboard.argtypes = [ctypes.c_void_p]
+    user32.GetClipboardData.argtypes = [ctypes.c_uint]
+    user32.GetClipboardData.restype = ctypes.c_void_p
+    kernel32.GlobalLock.argtypes = [ctypes.c_void_p]
+    kernel32.GlobalLock.restype = ctypes.c_void_p
+    kernel32.GlobalUnlock.argtypes = [ctypes.c_void_p]
+
+    def win_paste():
+        # another app may hold the clipboard open for a moment; retry briefly
+        for _ in range(5):
+            if user32.OpenClipboard(None):
+                break
+            time.sleep(0.01)
+        else:
+            return ""
+        try:
+            h = user32.GetClipboardData(CF_UNICODETEXT)
+            if not h:
+                return ""
+            p = kernel32.GlobalLock(h)
+            if not p:
+                return ""
+            try:
+                return ctypes.wstring_at(p)
+            finally:
+                kernel32.GlobalUnlock(h)
+        finally:
+            user32.CloseClipboard()
+
+    return win_paste
+
+paste_text = pyperclip.paste
+if os.name == "nt":
+    try:
+        paste_text = _make_win_paste()
+    except Exception as e:
+        print("Direct clipboard access unavailable, using pyperclip:", e)
 
 # ----------------------------
 # Clipboard watcher thread
 # ----------------------------
-clip_q = queue.Queue()
+# Queues are bounded so a stalled consumer (e.g. a modal dialog blocking the Tk
+# loop) can't make them grow forever; producers drop the oldest item instead
+# of blocking.
+QUEUE_MAXSIZE = 64
+
+def put_drop_oldest(q, item):
+    while True:
+        try:
+            q.put_nowait(item)
+            return
+        except queue.Full:
+            try:
+                q.get_nowait()
+            except queue.Empty:
+                pass
+
+clip_q = queue.Queue(maxsize=QUEUE_MAXSIZE)
 stop_event = threading.Event()
 
-def clipboard_watcher(poll_interval=POLL_INTERVAL):
+# Windows bumps this counter on every clipboard change. Reading it is much
+# cheaper than paste_text() (open clipboard + copy the text), so the poller
+# only pastes when it moved. None on other platforms.
+try:
+    _get_clip_seq = ctypes.windll.user32.GetClipboardSequenceNumber
+    _get_clip_seq.restype = ctypes.c_uint
+except Exception:
+    _get_clip_seq = None
+
+# The loops below bind the globals they hit on every iteration as default
+# arguments, so lookups are fast locals instead of module dict lookups.
+def clipboard_watcher(poll_interval=POLL_INTERVAL, _paste=paste_text, _sleep=time.sleep,
+                      _stop=stop_event, _get_seq=_get_clip_seq, _check=could_have_coords,
+                      _put=put_drop_oldest, _q=clip_q):
     last = ""
-    while not stop_event.is_set():
+    last_seq = None
+    while not _stop.is_set():
+        seq = None
+        if _get_seq is not None:
+            seq = _get_seq()
+            # 0 means no clipboard access; just paste every time then
+            if seq and seq == last_seq:
+                _sleep(poll_interval)
+                continue
         try:
-            text = pyperclip.paste()
+            text = _paste()
         except Exception:
             text = ""
+        # only remember the sequence number once it has actually been read, so a
+        # failed read (clipboard held open by another app, ...) is retried next tick
+        if text:
+            last_seq = seq
         if text and text != last:
             last = text
-            clip_q.put(text)
-        time.sleep(poll_interval)
+            if _check(text):
+                _put(_q, text)
+        _sleep(poll_interval)
 
 # ----------------------------
-# Worker: parse clipboard and write waypoint
+# Event-driven clipboard listener (Windows)
 # ----------------------------
-recent_copied = []   # list of (raw_text, parsed_coords or None)
-recent_waypoints = []  # list of (line, timestamp)
+# Registers the Tk window as a clipboard format listener so Windows sends
+# WM_CLIPBOARDUPDATE on every change -> no wakeups while idle and no poll delay.
+# clipboard_watcher above is only used when this can't be installed.
+WM_CLIPBOARDUPDATE = 0x031D
+GWL_WNDPROC = -4
+
+class ClipboardListener:
+    def __init__(self):
+        self.hwnd = None
+        self.last = ""
+        self._user32 = None
+        self._set_wl = None
+        self._wndproc = None      # keep a reference so the callback isn't GC'd
+        self._old_wndproc = None
+
+    def install(self, widget):
+        """Hook widget's window; returns False if unsupported (non-Windows, old Windows, ...)."""
+        if os.name != "nt":
+            return False
+        try:
+            import ctypes.wintypes as wt
+            user32 = ctypes.windll.user32
+            LRESULT = wt.LPARAM
+            WNDPROC = ctypes.WINFUNCTYPE(LRESULT, wt.HWND, wt.UINT, wt.WPARAM, wt.LPARAM)
+            # SetWindowLongPtrW only exists on 64-bit Windows
+            set_wl = getattr(user32, "SetWindowLongPtrW", None) or user32.SetWindowLongW
+            set_wl.argtypes = [wt.HWND, ctypes.c_int, ctypes.c_void_p]
+            set_wl.restype = ctypes.c_void_p
+            user32.CallWindowProcW.argtypes = [ctypes.c_void_p, wt.HWND, wt.UINT, wt.WPARAM, wt.LPARAM]
+            user32.CallWindowProcW.restype = LRESULT
+            user32.AddClipboardFormatListener.argtypes = [wt.HWND]
+            user32.RemoveClipboardFormatListener.argtypes = [wt.HWND]
+
+            widget.update_idletasks()
+            hwnd = widget.winfo_id()
+            if not user32.AddClipboardFormatListener(hwnd):
+                return False
+
+            def wndproc(h, msg, wparam, lparam):
+                if msg == WM_CLIPBOARDUPDATE:
+                    self.on_update()
+                    return 0
+                return user32.CallWindowProcW(self._old_wndproc, h, msg, wparam, lparam)
+
+            self._wndproc = WNDPROC(wndproc)
+            self._old_wndproc = set_wl(hwnd, GWL_WNDPROC, ctypes.cast(self._wndproc, ctypes.c_void_p))
+            if not self._old_wndproc:
+                user32.RemoveClipboardFormatListener(hwnd)
+                self._wndproc = None
+                return False
+            self._set_wl = set_wl
+            self._user32 = user32
+            self.hwnd = hwnd
+        except Exception as e:
+            print("Clipboard listener unavailable, falling back to polling:", e)
+            return False
+        # pick up whatever is already on the clipboard, like the poller does on start
+        self.on_update()
+        return True
+
+    def on_update(self):
+        try:
+            text = paste_text()
+        except Exception:
+            text = ""
+        if text and text != self.last:
+            self.last = text
+            if could_have_coords(text):
+                put_drop_oldest(clip_q, text)
+
+    def uninstall(self):
+        if self.hwnd is None:
+            return
+        try:
+            self._user32.RemoveClipboardFormatListener(self.hwnd)
+            self._set_wl(self.hwnd, GWL_WNDPROC, self._old_wndproc)
+        except Exception:
+            pass
+        self.hwnd = None
 
+# ----------------------------
+# Worker: parse clipboard and write waypoint
+# ----------------------------
 def process_clip_item(text):
     txt = text.strip()
-    # First try the enhanced /tp parser
-    parsed = parse_tp_command(txt)
-    if parsed:
-        return parsed
-    # Try X: ... Z:
-    m = re_XZ.search(txt)
-    if m:
-        x, z = m.groups()
-        y = settings.get("y_default", DEFAULT_Y)
-        return int(x), int(y), int(z)
-    # Try plain triple
-    m = re_plain.search(txt)
-    if m:
-        x, y, z = m.groups()
-        return int(x), int(y), int(z)
-    return None
+    if not could_have_coords(txt):
+        return None
+    m = _RE_ANY.search(txt)
+    # Common /tp forms
+    if m and m.group("tz") is not None:
+        return _tp_coords([c for c in m.group("tx", "ty", "tz") if c is not None])
+    # Slow path for the more exotic /tp variants
+    if txt[:3].lower() == "/tp":
+        parsed = parse_tp_command(txt)
+        if parsed:
+            return parsed
+    if not m:
+        return None
+    # X: ... [Y: ...] Z:
+    if m.group("xz_x") is not None:
+        y = m.group("xz_y")
+        if y is None:
+            y = settings.get("y_default", DEFAULT_Y)
+        return int(m.group("xz_x")), int(y), int(m.group("xz_z"))
+    # Plain triple
+    return int(m.group("p_x")), int(m.group("p_y")), int(m.group("p_z"))
+
+# The waypoint file is held open as a raw O_APPEND fd only for the length of a
+# burst: lines are buffered as bytes and written with a single os.write every
+# WP_FLUSH_EVERY lines, and the fd is closed once processor_loop goes idle (or
+# on exit). Reopening per burst means a file that was replaced or deleted in
+# the meantime is picked up / recreated instead of writing to a stale inode,
+# and other programs aren't blocked from replacing it on Windows.
+WP_FLUSH_EVERY = 16
+_WP_EOL = os.linesep.encode("ascii")  # same line endings a text-mode open() would write
+_WP_OPEN_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_APPEND | getattr(os, "O_BINARY", 0)
+_wp_lock = threading.Lock()
+_wp_fd = None
+_wp_path = None
+_wp_buf = []  # encoded lines (without EOL) not yet written
+
+def _flush_wp_buf():
+    # caller holds _wp_lock
+    if not _wp_buf:
+        return
+    # line endings are added by the join, not per line; the trailing b"" gives the
+    # last line its EOL
+    _wp_buf.append(b"")
+    data = memoryview(_WP_EOL.join(_wp_buf))
+    while data:
+        data = data[os.write(_wp_fd, data):]
+    _wp_buf.clear()
+
+def _close_wp_file(discard=False):
+    # caller holds _wp_lock
+    global _wp_fd, _wp_path
+    if discard:
+        _wp_buf.clear()
+    fd = _wp_fd
+    try:
+        if fd is not None:
+            _flush_wp_buf()
+    finally:
+        _wp_buf.clear()
+        _wp_fd, _wp_path = None, None
+        if fd is not None:
+            os.close(fd)
+
+def append_waypoint_line(line, flush=False):
+    global _wp_fd, _wp_path
+    fpath = settings.get("waypoint_file", DEFAULT_WAYPOINT_FILE)
+    with _wp_lock:
+        try:
+            if _wp_fd is None or fpath != _wp_path:
+                old_path = _wp_path
+                try:
+                    _close_wp_file()
+                except Exception as e:
+                    # lines buffered for the previous file were already reported as added
+                    return False, f"Failed to write pending waypoints to {old_path}: {e}"
+                try:
+                    # ensure parent dir exists (only needed when the path changes)
+                    os.makedirs(os.path.dirname(fpath), exist_ok=True)
+                except Exception:
+                    pass
+                _wp_fd = os.open(fpath, _WP_OPEN_FLAGS, 0o644)
+                _wp_path = fpath
+            _wp_buf.append(line.encode("utf-8"))
+            if flush or len(_wp_buf) >= WP_FLUSH_EVERY:
+                _flush_wp_buf()
+            return True, None
+        except Exception as e:
+            try:
+                _close_wp_file(discard=True)
+            except Exception:
+                pass
+            return False, str(e)
+
+def flush_waypoint_file():
+    # Write out whatever is buffered and close the fd until the next burst
+    with _wp_lock:
+        if _wp_fd is None:
+            return True, None
+        try:
+            _close_wp_file()
+            return True, None
+        except Exception as e:
+            return False, str(e)
 
-def append_waypoint_line(line):
+def close_waypoint_file():
+    with _wp_lock:
+        try:
+            _close_wp_file()
+        except Exception as e:
+            print("Failed to close waypoint file:", e)
+
+atexit.register(close_waypoint_file)
+
+def _tail_lines(path, n=64 * 1024):
+    """Raw lines from the last n bytes of path (the first, possibly partial, line is dropped)."""
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        f.seek(max(0, size - n))
+        data = f.read()
+    lines = data.splitlines()
+    if size > n and lines:
+        lines = lines[1:]
+    return lines
+
+def load_recent_waypoints():
+    # Seed the waypoint list from the end of the waypoint file, so it isn't empty
+    # after a restart; only the tail is read no matter how large the file is.
+    # Returns (line, timestamp) entries, newest first.
     fpath = settings.get("waypoint_file", DEFAULT_WAYPOINT_FILE)
     try:
-        # ensure parent dir exists
-        os.makedirs(os.path.dirname(fpath), exist_ok=True)
-    except Exception:
-        pass
-    try:
-        with open(fpath, "a", encoding="utf-8") as f:
-            f.write(line + "\n")
-        return True, None
-    except Exception as e:
-        return False, str(e)
-
-def processor_loop(gui_queue):
-    while not stop_event.is_set():
+        lines = _tail_lines(fpath)
+    except OSError:
+        return []
+    wp_lines = [ln for ln in lines if ln.startswith(b"waypoint:")][-MAX_HISTORY:]
+    return [(raw.decode("utf-8", "replace"), "(from file)") for raw in reversed(wp_lines)]
+
+def processor_loop(gui_queue, _get=clip_q.get, _empty=queue.Empty, _stop=stop_event,
+                   _settings=settings, _proc=process_clip_item, _gen=generate_waypoint_line,
+                   _append=append_waypoint_line, _flush=flush_waypoint_file, _put=put_drop_oldest,
+                   _now=_now_str):
+    while not _stop.is_set():
         try:
-            text = clip_q.get(timeout=0.2)
-        except queue.Empty:
+            text = _get(timeout=0.2)
+        except _empty:
+            # idle: push any buffered waypoint lines out to the file
+            ok, err = _flush()
+            if not ok:
+                _put(gui_queue, ("error", f"Failed to write waypoint: {err}"))
             continue
-        parsed = process_clip_item(text)
-        # add to recent_copied
-        recent_copied.insert(0, (text, parsed))
-        limit = settings.get("recent_limit", 12)
-        recent_copied[:] = recent_copied[:limit]
-        gui_queue.put(("update_copied", recent_copied.copy()))
-        if parsed and settings.get("autowrite", True):
+        parsed = _proc(text)
+        _put(gui_queue, ("append_copied", (text, parsed)))
+        if parsed and _settings.get("autowrite", True):
             x, y, z = parsed
-            line = generate_waypoint_line(x, y, z)
-            ok, err = append_waypoint_line(line)
-            ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            line = _gen(x, y, z)
+            ok, err = _append(line)
+            ts = _now()
             if ok:
-                recent_waypoints.insert(0, (line, ts))
-                recent_waypoints[:] = recent_waypoints[:limit]
-                gui_queue.put(("update_waypoints", recent_waypoints.copy()))
-                gui_queue.put(("notify", f"Added waypoint {x},{y},{z}"))
+                _put(gui_queue, ("append_waypoint", (line, ts)))
+                _put(gui_queue, ("notify", f"Added waypoint {x},{y},{z}"))
             else:
-                gui_queue.put(("error", f"Failed to write waypoint: {err}"))
+                _put(gui_queue, ("error", f"Failed to write waypoint: {err}"))
 
 # ----------------------------
 # GUI
@@ -239,7 +601,8 @@ class App(tk.Tk):
         self.geometry("800x520")
         self.protocol("WM_DELETE_WINDOW", self.on_close)
 
-        self.gui_queue = queue.Queue()
+        self.gui_queue = queue.Queue(maxsize=QUEUE_MAXSIZE)
+        self.clip_listener = None  # set by main() when the event-driven listener is active
 
         # Top frame: waypoint file chooser and status
         top = ttk.Frame(self)
@@ -249,6 +612,7 @@ class App(tk.Tk):
         self.file_var = tk.StringVar(value=settings.get("waypoint_file"))
         self.file_entry = ttk.Entry(top, textvariable=self.file_var, width=60)
         self.file_entry.pack(side="left", padx=(6,6))
+        self.bind_setting_change(self.file_entry, lambda: self._on_str_change("waypoint_file", self.file_var))
         ttk.Button(top, text="Choose...", command=self.choose_file).pack(side="left")
         ttk.Button(top, text="Open folder", command=self.open_folder).pack(side="left", padx=(6,0))
 
@@ -260,6 +624,10 @@ class App(tk.Tk):
         left.pack(side="left", fill="both", expand=True, padx=(0,6))
 
         self.copied_list = tk.Listbox(left, height=18)
+        # Entries currently shown in each Listbox, in display order; selections are
+        # looked up here
+        self.copied_rows = deque(maxlen=MAX_HISTORY)  # (raw_text, parsed_coords or None)
+        self.wp_rows = deque(maxlen=MAX_HISTORY)      # (line, timestamp)
         self.copied_list.pack(fill="both", expand=True, padx=6, pady=6)
         self.copied_list.bind("<Double-Button-1>", self.on_copied_double)
 
@@ -282,36 +650,41 @@ class App(tk.Tk):
         ttk.Checkbutton(ctrls, text="Auto-write", variable=self.autowrite_var, command=self.toggle_autowrite).grid(row=0,column=0, sticky="w")
 
         self.auto_name_var = tk.BooleanVar(value=settings.get("auto_name"))
-        ttk.Checkbutton(ctrls, text="Auto-name", variable=self.auto_name_var, command=self.update_setting).grid(row=0,column=1, sticky="w", padx=(8,0))
+        ttk.Checkbutton(ctrls, text="Auto-name", variable=self.auto_name_var, command=lambda: self._on_bool_change("auto_name", self.auto_name_var)).grid(row=0,column=1, sticky="w", padx=(8,0))
 
         ttk.Label(ctrls, text="Prefix:").grid(row=0,column=2, padx=(8,2))
         self.prefix_var = tk.StringVar(value=settings.get("name_prefix"))
         ttk.Entry(ctrls, textvariable=self.prefix_var, width=12).grid(row=0,column=3)
+        self.prefix_var.trace_add("write", lambda *_: self._on_str_change("name_prefix", self.prefix_var, "Auto"))
 
         self.append_ts_var = tk.BooleanVar(value=settings.get("append_timestamp_to_name"))
-        ttk.Checkbutton(ctrls, text="TS in name", variable=self.append_ts_var, command=self.update_setting).grid(row=0,column=4, padx=(8,0))
+        ttk.Checkbutton(ctrls, text="TS in name", variable=self.append_ts_var, command=lambda: self._on_bool_change("append_timestamp_to_name", self.append_ts_var)).grid(row=0,column=4, padx=(8,0))
 
         # Second row: color & visibility
         ttk.Label(ctrls, text="Color:").grid(row=1,column=0, pady=(6,0))
-        self.color_spin = tk.Spinbox(ctrls, from_=0, to=15, width=4)
+        on_color = lambda: self._on_int_change("color", self.color_spin)
+        self.color_spin = tk.Spinbox(ctrls, from_=0, to=15, width=4, command=on_color)
         self.color_spin.delete(0,"end"); self.color_spin.insert(0, str(settings.get("color",0)))
         self.color_spin.grid(row=1,column=1, sticky="w")
+        self.bind_setting_change(self.color_spin, on_color)
 
         self.random_color_var = tk.BooleanVar(value=settings.get("random_color"))
-        ttk.Checkbutton(ctrls, text="Randomize color", variable=self.random_color_var, command=self.update_setting).grid(row=1,column=2, columnspan=2, sticky="w", padx=(8,0))
+        ttk.Checkbutton(ctrls, text="Randomize color", variable=self.random_color_var, command=lambda: self._on_bool_change("random_color", self.random_color_var)).grid(row=1,column=2, columnspan=2, sticky="w", padx=(8,0))
 
         ttk.Label(ctrls, text="Visibility:").grid(row=1,column=4, padx=(8,2))
         self.vis_combo = ttk.Combobox(ctrls, values=[0,1,2], width=4)
         self.vis_combo.set(str(settings.get("visibility_type",0)))
         self.vis_combo.grid(row=1,column=5)
+        self.bind_setting_change(self.vis_combo, lambda: self._on_int_change("visibility_type", self.vis_combo), "<<ComboboxSelected>>")
 
         self.disabled_var = tk.BooleanVar(value=settings.get("disabled"))
-        ttk.Checkbutton(ctrls, text="Disabled", variable=self.disabled_var, command=self.update_setting).grid(row=1,column=6, padx=(8,0))
+        ttk.Checkbutton(ctrls, text="Disabled", variable=self.disabled_var, command=lambda: self._on_bool_change("disabled", self.disabled_var)).grid(row=1,column=6, padx=(8,0))
 
         ttk.Label(ctrls, text="Type:").grid(row=1,column=7, padx=(8,2))
         self.type_combo = ttk.Combobox(ctrls, values=[0,1,2], width=4)
         self.type_combo.set(str(settings.get("wp_type",0)))
         self.type_combo.grid(row=1,column=8)
+        self.bind_setting_change(self.type_combo, lambda: self._on_int_change("wp_type", self.type_combo), "<<ComboboxSelected>>")
 
         # Right-side action buttons
         actions = ttk.Frame(bottom)
@@ -332,7 +705,8 @@ class App(tk.Tk):
         # which caused duplicate reads because main() also started them.)
 
         # Kick off GUI poll
-        self.after(200, self.poll_gui_queue)
+        self.after(250, self.poll_gui_queue)
+        self.after(SETTINGS_FLUSH_INTERVAL_MS, self.flush_settings_periodic)
 
     # GUI actions
     def choose_file(self):
@@ -346,7 +720,7 @@ class App(tk.Tk):
         if p:
             settings["waypoint_file"] = p
             self.file_var.set(p)
-            save_settings()
+            mark_settings_dirty()
             self.status_var.set(f"Waypoint file set: {p}")
 
     def open_folder(self):
@@ -365,94 +739,118 @@ class App(tk.Tk):
     def pause(self):
         settings["autowrite"] = False
         self.autowrite_var.set(False)
-        save_settings()
+        mark_settings_dirty()
         self.status_var.set("Auto-write paused")
 
     def resume(self):
         settings["autowrite"] = True
         self.autowrite_var.set(True)
-        save_settings()
+        mark_settings_dirty()
         self.status_var.set("Auto-write resumed")
 
     def toggle_autowrite(self):
         settings["autowrite"] = bool(self.autowrite_var.get())
-        save_settings()
+        mark_settings_dirty()
         self.status_var.set("Auto-write: " + ("On" if settings["autowrite"] else "Off"))
 
-    def update_setting(self):
-        # write UI values into settings
-        settings["auto_name"] = bool(self.auto_name_var.get())
-        settings["name_prefix"] = self.prefix_var.get() or "Auto"
-        settings["append_timestamp_to_name"] = bool(self.append_ts_var.get())
-        settings["random_color"] = bool(self.random_color_var.get())
-        try:
-            settings["color"] = int(self.color_spin.get())
-        except Exception:
-            settings["color"] = 0
-        try:
-            settings["visibility_type"] = int(self.vis_combo.get())
-        except Exception:
-            settings["visibility_type"] = 0
+    def bind_setting_change(self, widget, callback, *events):
+        # Typed values are committed when the user leaves the field or hits Enter
+        for ev in ("<FocusOut>", "<Return>") + events:
+            widget.bind(ev, lambda e: callback(), add="+")
+
+    # Per-widget setting handlers: each one only touches its own setting and
+    # does nothing when the value didn't actually change
+    def _set_setting(self, key, value):
+        if settings.get(key) == value:
+            return
+        settings[key] = value
+        if key in WP_FORMAT_KEYS:
+            refresh_waypoint_format()
+        mark_settings_dirty()
+        self.status_var.set("Settings updated")
+
+    def _on_bool_change(self, key, var):
+        self._set_setting(key, bool(var.get()))
+
+    def _on_str_change(self, key, var, default=None):
+        self._set_setting(key, var.get() or default or settings.get(key))
+
+    def _on_int_change(self, key, widget):
         try:
-            settings["wp_type"] = int(self.type_combo.get())
+            value = int(widget.get())
         except Exception:
-            settings["wp_type"] = 0
-        settings["disabled"] = bool(self.disabled_var.get())
-        settings["waypoint_file"] = self.file_var.get() or settings.get("waypoint_file")
-        save_settings()
-        self.status_var.set("Settings updated")
+            value = 0
+        self._set_setting(key, value)
+
+    def flush_settings_periodic(self):
+        flush_settings()
+        self.after(SETTINGS_FLUSH_INTERVAL_MS, self.flush_settings_periodic)
 
     def poll_gui_queue(self):
-        # update settings from UI first
-        self.update_setting()
+        # Settings are pushed by the widget callbacks, so this only drains
+        # updates coming from processor_loop
         while True:
             try:
                 cmd, payload = self.gui_queue.get_nowait()
             except queue.Empty:
                 break
-            if cmd == "update_copied":
-                self.refresh_copied(payload)
-            elif cmd == "update_waypoints":
-                self.refresh_waypoints(payload)
+            if cmd == "append_copied":
+                self.add_copied(*payload)
+            elif cmd == "append_waypoint":
+                self.add_waypoint(*payload)
             elif cmd == "notify":
                 self.status_var.set(payload)
             elif cmd == "error":
                 messagebox.showerror("Error", payload)
-        # Also copy from recent globals if changed by other thread
-        # (processor_loop already pushes updates into gui_queue)
-        self.after(200, self.poll_gui_queue)
+        self.after(250, self.poll_gui_queue)
 
-    def refresh_copied(self, items):
-        self.copied_list.delete(0, tk.END)
-        for raw, parsed in items:
-            if parsed:
-                s = f"{raw}  →  {parsed[0]},{parsed[1]},{parsed[2]}"
-            else:
-                s = f"{raw}  →  (no coords)"
-            self.copied_list.insert(tk.END, s)
+    @staticmethod
+    def format_copied(raw, parsed):
+        if parsed:
+            return f"{raw}  →  {parsed[0]},{parsed[1]},{parsed[2]}"
+        return f"{raw}  →  (no coords)"
+
+    @staticmethod
+    def format_waypoint(line, ts):
+        return f"{ts}  {line}"
+
+    @staticmethod
+    def prepend_row(listbox, rows, item, s):
+        # keep the bounded rows deque and the Listbox in lockstep
+        rows.appendleft(item)
+        listbox.insert(0, s)
+        if listbox.size() > rows.maxlen:
+            listbox.delete(tk.END)
 
+    def add_copied(self, raw, parsed):
+        self.prepend_row(self.copied_list, self.copied_rows, (raw, parsed), self.format_copied(raw, parsed))
+
+    def add_waypoint(self, line, ts):
+        self.prepend_row(self.wp_list, self.wp_rows, (line, ts), self.format_waypoint(line, ts))
+
+    # Full rebuild, only used for the initial load; new entries go through add_waypoint
     def refresh_waypoints(self, items):
+        self.wp_rows.clear()
+        self.wp_rows.extend(items)
         self.wp_list.delete(0, tk.END)
-        for line, ts in items:
-            display = f"{ts}  {line}"
-            self.wp_list.insert(tk.END, display)
+        for line, ts in self.wp_rows:
+            self.wp_list.insert(tk.END, self.format_waypoint(line, ts))
 
     def on_copied_double(self, event):
         sel = self.copied_list.curselection()
         if not sel:
             return
         idx = sel[0]
-        raw, parsed = recent_copied[idx]
+        raw, parsed = self.copied_rows[idx]
         if parsed:
             x,y,z = parsed
             # show a small dialog to allow manual writing
             if messagebox.askyesno("Write waypoint?", f"Write waypoint at {x},{y},{z} to file now?"):
                 line = generate_waypoint_line(x,y,z)
-                ok, err = append_waypoint_line(line)
+                ok, err = append_waypoint_line(line, flush=True)
                 if ok:
-                    ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    recent_waypoints.insert(0, (line, ts))
-                    self.refresh_waypoints(recent_waypoints)
+                    ts = _now_str()
+                    self.add_waypoint(line, ts)
                     self.status_var.set(f"Wrote waypoint {x},{y},{z}")
                 else:
                     messagebox.showerror("Write failed", f"Failed to write waypoint: {err}")
@@ -464,7 +862,7 @@ class App(tk.Tk):
         if not sel:
             return
         idx = sel[0]
-        line, ts = recent_waypoints[idx]
+        line, ts = self.wp_rows[idx]
         # copy the line to clipboard
         pyperclip.copy(line)
         self.status_var.set("Waypoint line copied to clipboard")
@@ -475,13 +873,13 @@ class App(tk.Tk):
             messagebox.showinfo("No selection", "Select a waypoint in the right list to copy.")
             return
         idx = sel[0]
-        line, ts = recent_waypoints[idx]
+        line, ts = self.wp_rows[idx]
         pyperclip.copy(line)
         self.status_var.set("Waypoint line copied to clipboard")
 
     def clear_lists(self):
-        recent_copied.clear()
-        recent_waypoints.clear()
+        self.copied_rows.clear()
+        self.wp_rows.clear()
         self.copied_list.delete(0, tk.END)
         self.wp_list.delete(0, tk.END)
         self.status_var.set("Lists cleared")
@@ -489,37 +887,32 @@ class App(tk.Tk):
     def on_close(self):
         if messagebox.askokcancel("Quit", "Quit Xaero Clipboard Bridge?"):
             stop_event.set()
-            save_settings()
+            flush_settings(force=True)
+            close_waypoint_file()
+            if self.clip_listener:
+                self.clip_listener.uninstall()
             self.destroy()
 
 # ----------------------------
 # main
 # ----------------------------
 def main():
-    gui_q = queue.Queue()
+    app = App()
+    app.refresh_waypoints(load_recent_waypoints())
+
     # Start processor thread that watches clip_q and writes files, sends gui updates
-    proc = threading.Thread(target=processor_loop, args=(gui_q,), daemon=True)
+    # straight into app.gui_queue (drained by App.poll_gui_queue)
+    proc = threading.Thread(target=processor_loop, args=(app.gui_queue,), daemon=True)
     proc.start()
 
-    # Start clipboard watcher thread
-    clip = threading.Thread(target=clipboard_watcher, daemon=True)
-    clip.start()
-
-    # Bridge threads to Tk main app by transferring gui_q items into app.gui_queue
-    app = App()
-
-    # attach background transfer: read from local gui_q and put into app.gui_queue
-    def forward_gui_q():
-        while True:
-            try:
-                item = gui_q.get_nowait()
-            except queue.Empty:
-                break
-            app.gui_queue.put(item)
-        if not stop_event.is_set():
-            app.after(150, forward_gui_q)
+    # Prefer clipboard change notifications; only poll when they're unavailable
+    listener = ClipboardListener()
+    if listener.install(app):
+        app.clip_listener = listener
+    else:
+        clip = threading.Thread(target=clipboard_watcher, daemon=True)
+        clip.start()
 
-    app.after(150, forward_gui_q)
     app.mainloop()
 
 if __name__ == "__main__":